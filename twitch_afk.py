@@ -1,37 +1,60 @@
-import subprocess
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
-from PIL import Image, ImageDraw
-import pystray
-import schedule
 import threading
+import heapq
+import math
 import time
-import datetime
+import collections
+import re
 import os
 import sys
-
-# --- Current Known Issue & Troubleshooting Context for Collaborators ---
-# Despite efforts, the application currently exits with a generic "Streamlink exited with error code 1:"
-# when attempting to watch a stream. The subprocess.CalledProcessError.stderr is consistently blank,
-# meaning Streamlink itself is not providing a detailed error message to stderr.
+import shutil
+import io
+import base64
+
+# 64x64 blue/white checker used as the tray icon, pre-rendered as a PNG so startup
+# only has to decode it instead of drawing it with ImageDraw.
+_ICON_PNG_B64 = (
+    "iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAIAAAAlC+aJAAAAX0lEQVR42u3Y0QkAIAhF0We0/8o1hUJx7gDKAb+s5KSz0zs+K48HAAAAAAAAAAAAAAAAAAAAAAAAAAAAMN/u/t+3AwZ2VDkhAAAAAAAAAAAAAAAAAAAAAAAAAACArwAXT/AFgXjTGt0AAAAASUVORK5CYII="
+)
+
+# Validates the scheduling time input (HH:MM, 24h)
+_HHMM_RE = re.compile(r"^(?:[01]\d|2[0-3]):[0-5]\d$")
+
+# Per-channel Streamlink log files are truncated and restarted once they reach this size
+_LOG_MAX_BYTES = 1024 * 1024
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w-]")
+
+def _next_run_epoch(hhmm, now):
+    """Returns the epoch time of the next local-time occurrence of `hhmm` strictly after `now`."""
+    hour, minute = map(int, hhmm.split(":"))
+    today = time.localtime(now)
+    run_at = time.mktime((today.tm_year, today.tm_mon, today.tm_mday, hour, minute, 0, 0, 0, -1))
+    if run_at <= now:
+        # mktime normalises the day overflow, and recomputing (rather than adding 86400) keeps DST changes correct
+        run_at = time.mktime((today.tm_year, today.tm_mon, today.tm_mday + 1, hour, minute, 0, 0, 0, -1))
+    return run_at
+
+# --- Troubleshooting Context for Collaborators ---
+# Streamlink used to exit with a bare "Streamlink exited with error code 1:" and an empty stderr,
+# because Streamlink writes its log messages, errors included, to stdout, which was not captured.
+#
+# Current state:
+# 1. Streamlink runs with stderr merged into stdout, so every line it prints is captured.
+# 2. When Streamlink exits with a non-zero code, the error dialog shows the last 20 lines of its output.
+# 3. All output is also kept in memory for the "Show Log" viewer (the most recent 2048 lines across
+#    all streams) and written to `logs/streamlink_<channel>.log` next to this script or executable
+#    (capped at 1 MiB; skipped if that folder is not writable).
 #
-# Past troubleshooting has confirmed:
-# 1. Streamlink version 7.5.0 is used (verified via `streamlink --version` and debug pop-up).
-# 2. The deprecated `--cookies` argument has been REMOVED from the Streamlink command.
-#    Cookies are now handled via `streamlinkrc` (located in the same directory as this script),
-#    which points to `cookies.txt` (`twitch-cookies-path = cookies.txt` in streamlinkrc).
-# 3. MPV is correctly installed and in the system's PATH (verified via `mpv` in CMD).
-# 4. The MPV player command in Streamlink is now split, using `--player mpv` and `--player-args "..."`
-#    to improve robustness in passing arguments, as a previous error indicated "Player executable not found"
-#    even when MPV was in PATH with the old `--player "mpv args"` syntax.
-# 5. The `cookies.txt` file format is confirmed to be standard Netscape.
+# Setup notes confirmed during earlier troubleshooting:
+# - Cookies are not passed with the deprecated `--cookies` argument; `streamlinkrc` (in the same
+#   directory as this script) points to `cookies.txt` via `twitch-cookies-path = cookies.txt`.
+# - `cookies.txt` must be in the standard Netscape format.
+# - MPV is passed as `--player <path>` plus `--player-args "..."`; the old combined
+#   `--player "mpv args"` syntax produced "Player executable not found" even with MPV in PATH.
 #
-# Potential areas for collaboration to investigate:
-# - Why Streamlink 7.5.0 is exiting with code 1 without stderr output.
-# - Possible issues with specific Twitch cookies (e.g., expiration, insufficient permissions for stream type).
-# - Subtle interactions between Streamlink's arguments and certain system configurations.
-# - If Streamlink is logging more verbose errors elsewhere (e.g., a Streamlink log file if configured).
-# - A more robust way to handle the subprocess call to capture *all* Streamlink output, not just stderr.
+# When a stream fails, check the output tail or the channel's log file first: expired cookies,
+# missing permissions for the stream type and deprecated options all show up there.
 
 # --- CustomQuitDialog Class ---
 class CustomQuitDialog(tk.Toplevel):
@@ -39,21 +62,19 @@ class CustomQuitDialog(tk.Toplevel):
     A custom Tkinter Toplevel window providing a confirmation dialog
     for closing or minimizing the application. Offers distinct options
     to either terminate the application completely or minimize it to the system tray.
+    The dialog is built once and hidden between uses; call `ask()` to show it.
     """
+    DIALOG_WIDTH, DIALOG_HEIGHT = 350, 120
+
     def __init__(self, parent):
         super().__init__(parent)
+        self.withdraw()
         self.transient(parent)
-        self.grab_set()
         self.title("Exit Application")
         self.result = None
+        self._answered = tk.BooleanVar(self, False)
 
-        # Position dialog centrally relative to its parent window
-        parent_x, parent_y = parent.winfo_x(), parent.winfo_y()
-        parent_width, parent_height = parent.winfo_width(), parent.winfo_height()
-        dialog_width, dialog_height = 350, 120
-        x = parent_x + (parent_width // 2) - (dialog_width // 2)
-        y = parent_y + (parent_height // 2) - (dialog_height // 2)
-        self.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
+        self.geometry(f"{self.DIALOG_WIDTH}x{self.DIALOG_HEIGHT}")
         self.resizable(False, False)
 
         tk.Label(self, text="Do you want to close the application completely, or minimize it to the system tray?",
@@ -67,17 +88,125 @@ class CustomQuitDialog(tk.Toplevel):
 
         # Default action for window close (X) button
         self.protocol("WM_DELETE_WINDOW", self._minimize_to_tray)
-        self.wait_window(self)
+
+    def ask(self):
+        """
+        Shows the dialog centred on its parent, waits modally for a choice and returns it:
+        "close_completely" or "minimize_to_tray", or None if the app shut down meanwhile.
+        """
+        self.result = None
+        parent = self.master
+        x = parent.winfo_x() + (parent.winfo_width() - self.DIALOG_WIDTH) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - self.DIALOG_HEIGHT) // 2
+        self.geometry(f"+{x}+{y}")
+        self.deiconify()
+        self.grab_set()
+        self.wait_variable(self._answered)
+        return self.result
+
+    def _answer(self, result):
+        """Records the choice, hides the dialog for reuse and releases `ask()`."""
+        self.result = result
+        self.grab_release()
+        self.withdraw()
+        self._answered.set(True)
 
     def _close_completely(self):
-        """Sets result to 'close_completely' and destroys the dialog."""
-        self.result = "close_completely"
-        self.destroy()
+        """Sets result to 'close_completely' and hides the dialog."""
+        self._answer("close_completely")
 
     def _minimize_to_tray(self):
-        """Sets result to 'minimize_to_tray' and destroys the dialog."""
-        self.result = "minimize_to_tray"
-        self.destroy()
+        """Sets result to 'minimize_to_tray' and hides the dialog."""
+        self._answer("minimize_to_tray")
+
+# --- ScheduledJobsDialog Class ---
+class ScheduledJobsDialog(tk.Toplevel):
+    """
+    A Toplevel window listing the scheduled jobs in a Treeview, with a button
+    to cancel the selected job(s). Rows are keyed by job id, so cancelling
+    removes a single row instead of rebuilding the list.
+    """
+    def __init__(self, parent, jobs, on_cancel):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Scheduled Jobs")
+        self._jobs = jobs
+        self._on_cancel = on_cancel
+
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+        self.tree = ttk.Treeview(tree_frame, columns=("channel", "quality", "time"), show="headings", height=8)
+        for column, heading in (("channel", "Channel"), ("quality", "Quality"), ("time", "Time")):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=110)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(pady=(0, 10))
+
+        ttk.Button(button_frame, text="Cancel Selected Job", command=self._cancel_selected).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Close", command=self.destroy).pack(side=tk.LEFT, padx=10)
+
+        self.refresh()
+
+    def refresh(self):
+        """Repopulates the Treeview from the jobs dict, using each job id as the row iid."""
+        self.tree.delete(*self.tree.get_children())
+        for job_id, job_info in self._jobs.items():
+            self.tree.insert("", tk.END, iid=str(job_id), values=(job_info['channel'], job_info['quality'], job_info['time']))
+
+    def _cancel_selected(self):
+        """Cancels every selected job and removes its row."""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select a job to cancel.", parent=self)
+            return
+        for iid in selection:
+            self._on_cancel(int(iid))
+            self.tree.delete(iid)
+
+# --- StreamLogDialog Class ---
+class StreamLogDialog(tk.Toplevel):
+    """
+    A Toplevel window showing the most recent Streamlink output from all
+    streams, read from the application's bounded log ring buffer.
+    """
+    def __init__(self, parent, log_ring):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Streamlink Log")
+        self._log_ring = log_ring
+
+        text_frame = ttk.Frame(self)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+        self.text = tk.Text(text_frame, width=80, height=20, wrap=tk.NONE)
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(pady=(0, 10))
+
+        ttk.Button(button_frame, text="Refresh", command=self.refresh).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Close", command=self.destroy).pack(side=tk.LEFT, padx=10)
+
+        self.refresh()
+
+    def refresh(self):
+        """Replaces the text with the current contents of the ring buffer and scrolls to the end."""
+        # list() snapshots the deque in one step, so the asyncio thread can keep appending
+        lines = [f"[{channel}] {line.decode(errors='replace').rstrip()}" for channel, line in list(self._log_ring)]
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, "\n".join(lines) if lines else "No Streamlink output yet.")
+        self.text.configure(state=tk.DISABLED)
+        self.text.see(tk.END)
 
 # --- Main Application Class ---
 class TwitchAFKWatcher:
@@ -86,227 +215,494 @@ class TwitchAFKWatcher:
     using Streamlink and MPV. Designed for AFK viewing with minimal resource usage,
     supporting immediate watching, scheduling, and system tray integration.
     """
+    # MPV player arguments, passed as one string via Streamlink's --player-args:
+    #   --no-video      Skip video decoding and output entirely; no player window is created
+    #   --ao=null       Decode audio but never open an audio device
+    #   --idle=once     Exit immediately if no file is given on command line
+    _MPV_ARGS_STR = "--no-video --ao=null --really-quiet --idle=once"
+
+    # Streamlink options that follow the executable and player path.
+    # Streamlink 7.0.0+ automatically handles cookies via streamlinkrc.
+    # The --cookies argument is deprecated and removed.
+    # Ensure streamlinkrc exists and contains: twitch-cookies-path = cookies.txt
+    _STREAMLINK_ARGS = (
+        "--player-no-close",          # Keep the player open even if Streamlink exits
+        "--player-args", _MPV_ARGS_STR, # Pass MPV's specific arguments
+        "--retry-streams", "5",       # Retry connection to stream up to 5 times
+        "--twitch-disable-ads",       # Attempt to disable Twitch ads (note: this argument is deprecated in Streamlink 7.x)
+    )
+
     def __init__(self, master):
         self.master = master
         master.title("Twitch AFK Watcher")
-        master.geometry("400x300")
+        master.geometry("400x365")
         master.protocol("WM_DELETE_WINDOW", self._on_closing)
 
         # Determine the base path for external files (cookies.txt, streamlinkrc)
         # Handles both script execution and compiled executables (e.g., PyInstaller)
         self.base_path = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.abspath(".")
         self.cookie_file = os.path.join(self.base_path, "cookies.txt")
-
-        self.scheduled_jobs = []
-        self.current_stream_process = None
+        # Accepted names for the Streamlink config; the repo ships it as streamlinkrc.txt
+        self._streamlinkrc_paths = tuple(os.path.join(self.base_path, name) for name in ("streamlinkrc", "streamlinkrc.txt"))
+        self._warned_streamlinkrc = False # The missing-config warning is shown once per run
+        self._log_dir = os.path.join(self.base_path, "logs") # Per-channel Streamlink logs, created on first use
+
+        self.scheduled_jobs = {} # job id -> job info (time, channel, quality)
+        self._job_heap = [] # (next run epoch, job id); cancelled ids are dropped lazily
+        self._next_job_id = 0
+        self._jobs_dialog = None
+        self._log_dialog = None
+        self._log_ring = collections.deque(maxlen=2048) # (channel, raw line) from every stream; oldest lines drop off
+        self._channel_logs = {} # log file name -> shared log file state; only touched on `self.ioloop`
+        self._quit_dialog = None # Built on first close, then reused
+        self.stream_processes = set() # Running Streamlink asyncio processes, terminated on exit
+        self._shutdown = threading.Event() # Set once the app starts shutting down
         self.icon = None # pystray icon object
+        self.ioloop = None # Background asyncio loop supervising every Streamlink process; started on first watch
+        self._ioloop_thread = None
+        self._scheduled_in_flight = set() # Channels whose scheduled watch is still running
+        self._timer_after_id = None # Pending Tk `after` callback for the next due job
+        self._build_streamlink_base()
+        if not self._streamlink_exe or not self._mpv_exe:
+            master.after_idle(messagebox.showerror, "Missing Dependency", self._missing_executables_message())
 
         self._create_widgets()
-        self._start_scheduler_thread()
-        self._start_tray_icon_thread()
+        # pystray and PIL are slow to import; build the tray icon once the window has been drawn
+        master.after_idle(self._start_tray_icon_thread)
+
+    def _build_streamlink_base(self):
+        """
+        Builds the static part of the Streamlink command once, so `_afk_watch`
+        only has to append the channel URL and quality. The streamlink and mpv
+        executables are resolved on PATH here rather than on every launch.
+        """
+        self._streamlink_exe = shutil.which("streamlink")
+        self._mpv_exe = shutil.which("mpv")
+
+        self._streamlink_base = (
+            self._streamlink_exe or "streamlink",
+            "--player", self._mpv_exe or "mpv", # Specify MPV as the player executable
+            *self._STREAMLINK_ARGS
+        )
 
     def _create_widgets(self):
-        """Initializes and packs all Tkinter widgets for the main application window."""
-        tk.Label(self.master, text="Twitch Channel:").pack(pady=(10, 0))
+        """Initializes all Tkinter widgets for the main application window and lays them out in a single grid column."""
+        self.master.columnconfigure(0, weight=1)
+
+        # One named style carries the shared button width instead of repeating it per widget
+        ttk.Style(self.master).configure("AFK.TButton", width=25)
+
+        tk.Label(self.master, text="Twitch Channel:").grid(row=0, column=0, pady=(10, 0))
         self.channel_entry = tk.Entry(self.master, width=35)
-        self.channel_entry.pack(pady=5)
+        self.channel_entry.grid(row=1, column=0, pady=5)
         self.channel_entry.focus_set()
 
-        tk.Label(self.master, text="Stream Quality:").pack(pady=(10, 0))
+        tk.Label(self.master, text="Stream Quality:").grid(row=2, column=0, pady=(10, 0))
         self.quality_var = tk.StringVar(self.master)
         self.quality_var.set("best")
         quality_options = ["best", "high", "medium", "low", "worst"]
         quality_menu = ttk.Combobox(self.master, textvariable=self.quality_var, values=quality_options, state="readonly")
-        quality_menu.pack(pady=5)
+        quality_menu.grid(row=3, column=0, pady=5)
+
+        buttons = [
+            ("Start Watching Now", self._on_click_start),
+            ("Schedule Watching", self._schedule_watch),
+            ("Show/Cancel Scheduled Jobs", self._show_scheduled_jobs),
+            ("Show Log", self._show_log),
+            ("Hide to Tray", self._hide_window),
+        ]
+        for row, (text, command) in enumerate(buttons, start=4):
+            ttk.Button(self.master, text=text, command=command, style="AFK.TButton").grid(row=row, column=0, pady=5)
+        status_row = 4 + len(buttons)
 
-        ttk.Button(self.master, text="Start Watching Now", command=self._on_click_start, width=25).pack(pady=5)
-        ttk.Button(self.master, text="Schedule Watching", command=self._schedule_watch, width=25).pack(pady=5)
-        ttk.Button(self.master, text="Show/Cancel Scheduled Jobs", command=self._show_scheduled_jobs, width=25).pack(pady=5)
-        ttk.Button(self.master, text="Hide to Tray", command=self._hide_window, width=25).pack(pady=5)
+        # Non-modal status line for stream progress; message boxes are reserved for errors
+        self.status_var = tk.StringVar(self.master, value="Idle")
+        tk.Label(self.master, textvariable=self.status_var).grid(row=status_row, column=0, pady=(5, 0))
 
         tk.Label(self.master, text=f"Ensure 'cookies.txt' (NETSCAPE format) and 'streamlinkrc' are in:\n{self.base_path}",
-                 font=("Arial", 8), fg="gray", wraplength=350).pack(pady=(10, 0))
+                 font=("Arial", 8), fg="gray", wraplength=350).grid(row=status_row + 1, column=0, pady=(10, 0))
 
-    def _afk_watch(self, channel, quality):
+    async def _afk_watch(self, channel, quality):
         """
-        Core function to start watching a Twitch channel using Streamlink and MPV.
-        Configured for AFK viewing with minimal resource consumption.
+        Core coroutine to start watching a Twitch channel using Streamlink and MPV.
+        Configured for AFK viewing with minimal resource consumption. Runs on `self.ioloop`,
+        so any number of streams are supervised without a thread per stream.
 
-        Collaborator Note: This function currently triggers the "exit code 1" error.
-        The subprocess call to Streamlink is the primary area to investigate.
+        Streamlink's output (stderr merged into stdout) is drained into the log viewer and the
+        channel's log file, and its tail is shown if Streamlink exits with an error.
         """
-        url = f"https://twitch.tv/{channel}"
+        import asyncio
+        import subprocess
 
-        # MPV player arguments defined as a list, to be passed via Streamlink's --player-args
-        mpv_args = [
-            "--mute=yes",
-            "--really-quiet",
-            "--no-border",
-            "--geometry=0x0+0x0", # Sets window to 0x0 size at 0,0 position
-            "--no-osc",           # No on-screen controller
-            "--idle=once"         # Exit immediately if no file is given on command line
-        ]
-        mpv_args_string = " ".join(mpv_args)
+        url = f"https://twitch.tv/{channel}"
 
         try:
-            self.master.after(0, lambda: messagebox.showinfo("Starting Stream", f"Attempting to watch {channel} at {quality} quality... This window may hide temporarily."))
-
-            streamlink_command = [
-                "streamlink",
-                # Streamlink 7.0.0+ automatically handles cookies via streamlinkrc.
-                # The --cookies argument is deprecated and removed.
-                # Ensure streamlinkrc exists and contains: twitch-cookies-path = cookies.txt
-
-                "--player-no-close",         # Keep the player open even if Streamlink exits
-                "--player", "mpv",           # Specify MPV as the player executable
-                "--player-args", mpv_args_string, # Pass MPV's specific arguments
-                "--retry-streams", "5",      # Retry connection to stream up to 5 times
-                "--twitch-disable-ads",      # Attempt to disable Twitch ads (note: this argument is deprecated in Streamlink 7.x)
-                url, quality                 # The Twitch URL and desired stream quality
-            ]
-
-            result = subprocess.run(
-                streamlink_command,
-                capture_output=True, # Capture stdout and stderr
-                text=True,           # Decode stdout/stderr as text
-                check=True           # Raise CalledProcessError if Streamlink returns a non-zero exit code
-            )
-
-            self.master.after(0, lambda: messagebox.showinfo("Success", f"Successfully started watching {channel} at {quality} quality."))
+            self.master.after(0, self.status_var.set, f"Starting {channel} ({quality})...")
 
-        except subprocess.CalledProcessError as e:
-            # Capture and display Streamlink's stderr output if it exists.
-            # Currently, e.stderr is often empty for exit code 1.
-            error_message = f"Streamlink exited with error code {e.returncode}:\n{e.stderr}"
-            self.master.after(0, lambda: messagebox.showerror("Streamlink Error", error_message))
-        except FileNotFoundError:
-            # Catch if 'streamlink' or 'mpv' executables are not found in the system PATH.
-            self.master.after(0, lambda: messagebox.showerror("Error", "Streamlink or mpv not found. Please ensure they are installed and in your system's PATH."))
+            log = self._open_channel_log(channel)
+            try:
+                # The Twitch URL and desired stream quality are the only per-call arguments
+                proc = await asyncio.create_subprocess_exec(
+                    *self._streamlink_base, url, quality,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT, # Streamlink logs, including its errors, to stdout
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0) # No console window on Windows
+                )
+                self.stream_processes.add(proc)
+
+                self.master.after(0, self.status_var.set, f"Watching {channel} ({quality})")
+
+                output = collections.deque(maxlen=20) # Tail of this stream's output, for the error dialog
+                try:
+                    await self._drain(proc.stdout, channel, output, log)
+                    returncode = await proc.wait()
+                finally:
+                    if proc.returncode is None:
+                        # Draining failed (e.g. a line over the reader's limit); nothing reads the pipe any more
+                        try:
+                            proc.terminate()
+                        except ProcessLookupError:
+                            pass
+                    self.stream_processes.discard(proc)
+            finally:
+                self._close_channel_log(log)
+
+            if self._shutdown.is_set():
+                return
+            self.master.after(0, self.status_var.set, f"Stopped watching {channel}")
+            if returncode != 0:
+                # Output is kept as raw bytes; only the lines shown are decoded
+                tail = b"".join(output).decode(errors="replace").rstrip()
+                self.master.after(0, messagebox.showerror, "Streamlink Error", f"Streamlink exited with error code {returncode}:\n{tail}")
         except Exception as e:
             # Catch any other unexpected errors during execution.
-            self.master.after(0, lambda: messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}"))
+            if self._shutdown.is_set():
+                return # The window may already be gone
+            self.master.after(0, messagebox.showerror, "Error", f"An unexpected error occurred: {str(e)}")
+
+    def _open_channel_log(self, channel):
+        """
+        Returns the shared log state for `channel`, opening `logs/streamlink_<channel>.log`
+        if no other watch of the channel has it open. Concurrent watches of one channel
+        share a single handle, so neither truncates the file under the other. Logs are keyed
+        by the lowercased file name, so channels that map to the same file on a
+        case-insensitive filesystem share it too. If the log can't be written (e.g. a
+        read-only install folder) the file is None and the watch goes on without it.
+        Runs on `self.ioloop`.
+        """
+        name = f"streamlink_{_UNSAFE_FILENAME_RE.sub('_', channel)}.log".lower()
+        log = self._channel_logs.get(name)
+        if log is None:
+            try:
+                os.makedirs(self._log_dir, exist_ok=True)
+                log_file = open(os.path.join(self._log_dir, name), "wb", buffering=0)
+            except OSError:
+                log_file = None
+            log = self._channel_logs[name] = {"name": name, "file": log_file, "users": 0, "written": 0}
+        log["users"] += 1
+        return log
+
+    def _close_channel_log(self, log):
+        """Releases one watch's use of a channel log, closing it after the last one. Runs on `self.ioloop`."""
+        log["users"] -= 1
+        if log["users"] == 0:
+            del self._channel_logs[log["name"]]
+            if log["file"] is not None:
+                log["file"].close()
+
+    async def _drain(self, stream, channel, sink, log):
+        """
+        Reads `stream` line by line until EOF, appending the raw lines to `sink`,
+        the shared `_log_ring` and the channel's log file, which is restarted once it
+        exceeds `_LOG_MAX_BYTES`. Both deques are bounded, so memory stays flat however
+        long the stream runs.
+        """
+        log_file = log["file"]
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            if log_file is not None:
+                if log["written"] + len(line) > _LOG_MAX_BYTES:
+                    log_file.seek(0)
+                    log_file.truncate()
+                    log["written"] = 0
+                log_file.write(line)
+                log["written"] += len(line)
+            sink.append(line)
+            self._log_ring.append((channel, line))
 
     def _on_click_start(self):
         """
         Handles the 'Start Watching Now' button click.
-        Validates input and starts the `_afk_watch` function in a new daemon thread
-        to prevent the GUI from freezing.
+        Validates input and starts the `_afk_watch` coroutine on the background
+        asyncio loop to prevent the GUI from freezing.
         """
-        channel = self.channel_entry.get().strip()
+        channel = self.channel_entry.get().strip().lower() # Twitch channel names are case-insensitive
         quality = self.quality_var.get()
-        if channel:
-            threading.Thread(target=self._afk_watch, args=(channel, quality), daemon=True).start()
-        else:
+        if not channel:
             messagebox.showwarning("Input Error", "Please enter a channel name.")
+            return
+        if not self._check_prerequisites():
+            return
+        self._submit_watch(channel, quality)
+
+    def _missing_executables_message(self):
+        """Returns the error text shown when streamlink or mpv is not on PATH."""
+        missing = [name for name, path in (("streamlink", self._streamlink_exe), ("mpv", self._mpv_exe)) if not path]
+        return f"Could not find {' or '.join(missing)}. Please ensure they are installed and in your system's PATH."
+
+    def _check_prerequisites(self):
+        """
+        Checks that streamlink and mpv were found on PATH and that cookies.txt exists
+        before Streamlink is launched, so a broken setup is reported immediately rather
+        than after Streamlink fails. Returns True if everything required is present.
+        A missing streamlinkrc only produces a one-time warning, since Streamlink runs without it.
+        """
+        if not self._streamlink_exe or not self._mpv_exe:
+            messagebox.showerror("Missing Dependency", self._missing_executables_message())
+            return False
+        if not os.path.isfile(self.cookie_file):
+            messagebox.showerror("Missing Configuration", f"The following file could not be found:\n{self.cookie_file}")
+            return False
+        if not self._warned_streamlinkrc and not any(os.path.isfile(path) for path in self._streamlinkrc_paths):
+            self._warned_streamlinkrc = True
+            messagebox.showwarning("Missing Configuration", f"No streamlinkrc or streamlinkrc.txt found in:\n{self.base_path}\nStreamlink will run with its default settings.")
+        return True
+
+    def _submit_watch(self, channel, quality):
+        """
+        Schedules `_afk_watch` on the background asyncio loop so the Tk event loop is never
+        blocked. Returns a concurrent.futures.Future for the watch.
+        """
+        import asyncio
+
+        if self.ioloop is None:
+            self.ioloop = asyncio.new_event_loop()
+            self._ioloop_thread = threading.Thread(target=self.ioloop.run_forever, name="afk-io", daemon=True)
+            self._ioloop_thread.start()
+        return asyncio.run_coroutine_threadsafe(self._afk_watch(channel, quality), self.ioloop)
+
+    def _fire(self, channel, quality):
+        """
+        Scheduled-job callback. Submits the watch to the asyncio loop, skipping the
+        firing if a previous scheduled watch of the same channel is still running.
+        """
+        if channel in self._scheduled_in_flight:
+            return
+        self._scheduled_in_flight.add(channel)
+        future = self._submit_watch(channel, quality)
+        future.add_done_callback(lambda _: self._scheduled_in_flight.discard(channel))
 
     def _schedule_watch(self):
         """
         Handles the 'Schedule Watching' button click.
         Prompts for a time, validates input, and schedules the `_afk_watch` function
-        using the `schedule` library.
+        to run daily at that time.
         """
-        channel = self.channel_entry.get().strip()
+        channel = self.channel_entry.get().strip().lower() # Twitch channel names are case-insensitive
         quality = self.quality_var.get()
         if not channel:
             messagebox.showwarning("Input Error", "Please enter a channel name.")
             return
+        if not self._check_prerequisites():
+            return
 
         time_input = simpledialog.askstring("Schedule", "Enter time to start (HH:MM in 24h format):")
-        if time_input:
-            try:
-                datetime.datetime.strptime(time_input, "%H:%M")
-                job = schedule.every().day.at(time_input).do(self._afk_watch, channel=channel, quality=quality)
-                self.scheduled_jobs.append({"time": time_input, "channel": channel, "quality": quality, "job": job})
-                messagebox.showinfo("Scheduled", f"Watching {channel} at {quality} scheduled for {time_input}.")
-            except ValueError:
-                messagebox.showerror("Invalid Time", "Please enter time in HH:MM 24h format (e.g., 14:30).")
-        else:
+        if not time_input:
             messagebox.showinfo("Cancelled", "Scheduling cancelled.")
+            return
+        if not _HHMM_RE.match(time_input):
+            messagebox.showerror("Invalid Time", "Please enter time in HH:MM 24h format (e.g., 14:30).")
+            return
+
+        job_id = self._next_job_id
+        self._next_job_id += 1
+        self.scheduled_jobs[job_id] = {"time": time_input, "channel": channel, "quality": quality}
+        heapq.heappush(self._job_heap, (_next_run_epoch(time_input, time.time()), job_id))
+        self._arm_timer()
+        if self._jobs_dialog is not None and self._jobs_dialog.winfo_exists():
+            self._jobs_dialog.refresh()
+        messagebox.showinfo("Scheduled", f"Watching {channel} at {quality} scheduled for {time_input}.")
 
     def _show_scheduled_jobs(self):
         """
-        Displays a list of currently scheduled jobs and provides an option to cancel one.
+        Opens (or raises) the scheduled jobs window, from which jobs can be cancelled.
         """
         if not self.scheduled_jobs:
             messagebox.showinfo("Scheduled Jobs", "No jobs currently scheduled.")
             return
 
-        job_list_str = "Currently Scheduled Jobs:\n"
-        for i, job_info in enumerate(self.scheduled_jobs):
-            job_list_str += f"{i+1}. Channel: {job_info['channel']}, Quality: {job_info['quality']}, Time: {job_info['time']}\n"
+        if self._jobs_dialog is not None and self._jobs_dialog.winfo_exists():
+            self._jobs_dialog.refresh()
+            self._jobs_dialog.deiconify()
+            self._jobs_dialog.lift()
+        else:
+            self._jobs_dialog = ScheduledJobsDialog(self.master, self.scheduled_jobs, self._cancel_job)
+
+    def _show_log(self):
+        """Opens (or refreshes and raises) the window showing recent Streamlink output."""
+        if self._log_dialog is not None and self._log_dialog.winfo_exists():
+            self._log_dialog.refresh()
+            self._log_dialog.deiconify()
+            self._log_dialog.lift()
+        else:
+            self._log_dialog = StreamLogDialog(self.master, self._log_ring)
 
-        messagebox.showinfo("Scheduled Jobs", job_list_str)
+    def _cancel_job(self, job_id):
+        """Removes a scheduled job by id; its heap entry is discarded when it reaches the top."""
+        if self.scheduled_jobs.pop(job_id, None) is not None:
+            self._arm_timer()
 
-        if self.scheduled_jobs:
-            cancel_choice = simpledialog.askinteger("Cancel Job", "Enter the number of the job to cancel (0 to skip):",
-                                                   minvalue=0, maxvalue=len(self.scheduled_jobs))
-            if cancel_choice is not None and cancel_choice != 0:
-                index_to_cancel = cancel_choice - 1
-                if 0 <= index_to_cancel < len(self.scheduled_jobs):
-                    job_to_cancel = self.scheduled_jobs.pop(index_to_cancel)
-                    schedule.cancel_job(job_to_cancel['job'])
-                    messagebox.showinfo("Job Cancelled", f"Job for {job_to_cancel['channel']} at {job_to_cancel['time']} cancelled.")
-                else:
-                    messagebox.showwarning("Invalid Input", "Invalid job number.")
-            elif cancel_choice == 0:
-                messagebox.showinfo("Cancelled", "Job cancellation skipped.")
+    def _arm_timer(self):
+        """
+        (Re)registers a single Tk `after` callback for the earliest scheduled job,
+        so nothing wakes up until a job is actually due. With no jobs left, no
+        callback is registered.
+        """
+        if self._timer_after_id is not None:
+            self.master.after_cancel(self._timer_after_id)
+            self._timer_after_id = None
+        while self._job_heap and self._job_heap[0][1] not in self.scheduled_jobs:
+            heapq.heappop(self._job_heap)
+        if not self._job_heap:
+            return
+        delay_ms = max(0, math.ceil((self._job_heap[0][0] - time.time()) * 1000))
+        self._timer_after_id = self.master.after(delay_ms, self._fire_due)
+
+    def _fire_due(self):
+        """Fires every job that is due, re-queues each for the next day and re-arms the timer."""
+        self._timer_after_id = None
+        now = time.time()
+        while self._job_heap and self._job_heap[0][0] <= now:
+            _, job_id = heapq.heappop(self._job_heap)
+            job_info = self.scheduled_jobs.get(job_id)
+            if job_info is None:
+                continue
+            self._fire(job_info['channel'], job_info['quality'])
+            heapq.heappush(self._job_heap, (_next_run_epoch(job_info['time'], now), job_id))
+        self._arm_timer()
+
+    async def _terminate_streams_and_stop(self):
+        """
+        Terminates every running Streamlink process, gives the watches a moment to
+        finish, then stops the loop. Runs on `self.ioloop`.
+        """
+        import asyncio
 
-    def _run_scheduler(self):
+        procs = list(self.stream_processes)
+        for proc in procs:
+            try:
+                proc.terminate()
+            except ProcessLookupError:
+                pass # Already exited
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if pending:
+            await asyncio.wait(pending, timeout=3)
+        self.ioloop.stop()
+
+    def _stop_streams(self):
         """
-        Continuously checks for and runs pending scheduled jobs in a separate thread.
-        Sleeps for 1 second to prevent high CPU usage.
+        Asks the asyncio loop to terminate every running Streamlink process and stop, so
+        closing the app does not orphan them. Does not wait: the loop thread may itself be
+        blocked in a `master.after` call that only the Tk thread can service.
         """
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        if self.ioloop is not None:
+            import asyncio
+            asyncio.run_coroutine_threadsafe(self._terminate_streams_and_stop(), self.ioloop)
 
-    def _start_scheduler_thread(self):
-        """Starts the `_run_scheduler` function in a daemon thread."""
-        scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        scheduler_thread.start()
+    def _wait_for_streams_stopped(self, timeout=5):
+        """
+        Waits for the asyncio loop thread to finish terminating streams. Call only after
+        `root.mainloop()` has returned, when the Tk thread no longer has to service it.
+        """
+        if self._ioloop_thread is not None:
+            self._ioloop_thread.join(timeout)
 
-    # --- System Tray Icon Functions (using pystray) ---
-    def _create_image(self, width, height, color1, color2):
-        """Creates a simple square image for the system tray icon."""
-        image = Image.new('RGB', (width, height), color1)
-        dc = ImageDraw.Draw(image)
-        dc.rectangle((width // 2, 0, width, height // 2), fill=color2)
-        dc.rectangle((0, height // 2, width // 2, height), fill=color2)
-        return image
+    def _do_shutdown(self):
+        """
+        Stops the tray icon, running streams and asyncio loop, then destroys the window
+        so `root.mainloop()` returns and the process exits normally. Must run on the Tk thread.
+        """
+        self._shutdown.set()
+        if self.icon:
+            self.icon.stop()
+        self._stop_streams()
+        if self._quit_dialog is not None:
+            # Release a pending ask(): its wait_variable would otherwise never return once the window is gone
+            self._quit_dialog._answer(None)
+        self.master.destroy()
 
+    # --- System Tray Icon Functions (using pystray) ---
     def _setup_tray_icon(self, icon):
         """Callback for pystray to make the icon visible."""
         icon.visible = True
 
     def _exit_application(self, icon, item):
-        """Exits the entire application gracefully from the system tray menu."""
-        icon.stop()
-        self.master.quit()
-        sys.exit(0)
+        """
+        Exits the entire application gracefully from the system tray menu.
+        Runs on pystray's thread, so the actual shutdown is handed to the Tk thread.
+        """
+        self.master.after(0, self._do_shutdown)
 
     def _show_window(self, icon, item):
-        """Restores the main Tkinter window from the system tray."""
-        self.master.deiconify()
+        """
+        Restores the main Tkinter window from the system tray.
+        Called on pystray's thread, so the Tk call is queued onto the Tk thread.
+        """
+        self.master.after(0, self.master.deiconify)
 
     def _hide_window(self, icon=None, item=None):
-        """Hides the main Tkinter window to the system tray."""
-        self.master.withdraw()
+        """
+        Hides the main Tkinter window to the system tray.
+        May be called on pystray's thread, so the Tk call is queued onto the Tk thread.
+        Without a tray icon the window is only minimized, so it can't be orphaned.
+        """
+        self.master.after(0, self.master.withdraw if self.icon is not None else self.master.iconify)
 
     def _start_tray_icon_thread(self):
-        """Starts the system tray icon in a separate daemon thread."""
-        image = self._create_image(64, 64, 'blue', 'white')
-        self.icon = pystray.Icon(
-            "Twitch AFK Watcher",
-            image,
-            "Twitch AFK Watcher",
-            menu=pystray.Menu(
-                pystray.MenuItem("Show Window", self._show_window),
-                pystray.MenuItem("Hide Window", self._hide_window),
-                pystray.Menu.SEPARATOR,
-                pystray.MenuItem("Exit", self._exit_application)
+        """
+        Starts the system tray icon in a separate daemon thread. Does nothing if
+        the icon already exists, so a repeated call cannot leak a second tray icon.
+        """
+        if self.icon is not None:
+            return
+
+        try:
+            import pystray
+            from PIL import Image
+
+            image = Image.open(io.BytesIO(base64.b64decode(_ICON_PNG_B64)))
+            self.icon = pystray.Icon(
+                "Twitch AFK Watcher",
+                image,
+                "Twitch AFK Watcher",
+                menu=pystray.Menu(
+                    pystray.MenuItem("Show Window", self._show_window),
+                    pystray.MenuItem("Hide Window", self._hide_window),
+                    pystray.Menu.SEPARATOR,
+                    pystray.MenuItem("Exit", self._exit_application)
+                )
             )
-        )
-        threading.Thread(target=self.icon.run, args=(self._setup_tray_icon,), daemon=True).start()
+        except Exception as e:
+            # Runs from after_idle, where an exception would go unseen; hiding falls back to minimizing
+            messagebox.showerror("Tray Icon Error", f"Could not create the system tray icon, so the window will be minimized instead of hidden:\n{e}")
+            return
+        # Icon.run_detached() is not used: the Windows and X11 backends just start their own
+        # non-daemon thread, and on macOS it needs the NSApplication loop handed to pystray.
+        threading.Thread(target=self._run_tray_icon, name="afk-tray", daemon=True).start()
+
+    def _run_tray_icon(self):
+        """
+        Body of the tray thread. On Windows the thread first drops to below-normal
+        priority, so pystray's message loop never delays Tk redraws.
+        """
+        if os.name == "nt":
+            import ctypes
+            THREAD_PRIORITY_BELOW_NORMAL = -1
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_BELOW_NORMAL)
+        self.icon.run(self._setup_tray_icon)
 
     def _on_closing(self):
         """
@@ -314,17 +710,17 @@ class TwitchAFKWatcher:
         Uses a custom dialog to ask the user whether to quit or hide to tray.
         Ensures proper cleanup on exit.
         """
-        dialog = CustomQuitDialog(self.master)
-        if dialog.result == "close_completely":
-            if self.icon:
-                self.icon.stop()
-            self.master.destroy()
-            sys.exit(0)
-        elif dialog.result == "minimize_to_tray":
+        if self._quit_dialog is None:
+            self._quit_dialog = CustomQuitDialog(self.master)
+        result = self._quit_dialog.ask()
+        if result == "close_completely":
+            self._do_shutdown()
+        elif result == "minimize_to_tray":
             self._hide_window()
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
     root = tk.Tk()
     app = TwitchAFKWatcher(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app._wait_for_streams_stopped()
\ No newline at end of file